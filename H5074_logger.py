@@ -2,24 +2,54 @@
 
 import asyncio
 import sys
-import csv
+import struct
 from datetime import datetime
 from bleak import BleakScanner
+from bleak.exc import BleakError
+try:
+    from bleak.assigned_numbers import AdvertisementDataType
+    from bleak.backends.bluezdbus.advertisement_monitor import OrPattern
+    from bleak.backends.bluezdbus.scanner import BlueZScannerArgs
+except ImportError:  # older bleak or non-BlueZ backend
+    AdvertisementDataType = OrPattern = BlueZScannerArgs = None
 import json
 import os
 from typing import Dict, Optional
 import logging
 from logging.handlers import RotatingFileHandler
+import signal
 import time
 
+# Govee H5074 payload layout after the status byte: temperature and
+# humidity as little-endian uint16 (centi-units), then battery percent
+_H5074_FMT = struct.Struct('<HHB')
+
+# Manufacturer ID 60552 (0xEC88) little-endian, as it appears at the
+# start of the manufacturer-specific AD structure
+_GOVEE_MFR_PREFIX = b"\x88\xec"
+
 class GoveeSensor:
+    _ts_sec = 0
+    _ts_str = ''
+
     def __init__(self, mac_address: Optional[str] = None):
-        self.mac_address = mac_address
+        self._set_mac(mac_address)
         self.config_file = 'govee_config.json'
         self.data_file = f'govee_data_{datetime.now().strftime("%Y%m%d")}.csv'
         self.setup_logging()
-        self._last_log_time = 0
-        
+        self._csv_fh = None
+        self._csv_fields = None
+        self._header_written = False
+        self._log_queue = None
+        self._loop = None
+        self._row_pool = [dict() for _ in range(8)]
+        self.include_raw_hex = False
+
+    def _set_mac(self, mac_address: Optional[str]):
+        """Remember the configured MAC, normalized once for fast comparison"""
+        self.mac_address = mac_address
+        self._mac_set = {mac_address.upper()} if mac_address else set()
+
     def setup_logging(self):
         """Setup rotating log handler"""
         self.logger = logging.getLogger('GoveeSensor')
@@ -43,11 +73,11 @@ class GoveeSensor:
                         'name': device.name,
                         'rssi': device.rssi
                     })
-                    self.logger.info(f"Found device: {device.name} ({device.address})")
+                    self.logger.info("Found device: %s (%s)", device.name, device.address)
             
             return govee_devices
         except Exception as e:
-            self.logger.error(f"Scan error: {str(e)}")
+            self.logger.error("Scan error: %s", e)
             return []
 
     def save_config(self, mac_address: str):
@@ -56,10 +86,10 @@ class GoveeSensor:
             config = {'mac_address': mac_address}
             with open(self.config_file, 'w') as f:
                 json.dump(config, f)
-            self.mac_address = mac_address
-            self.logger.info(f"Configuration saved for device: {mac_address}")
+            self._set_mac(mac_address)
+            self.logger.info("Configuration saved for device: %s", mac_address)
         except Exception as e:
-            self.logger.error(f"Error saving configuration: {str(e)}")
+            self.logger.error("Error saving configuration: %s", e)
 
     def load_config(self) -> Optional[str]:
         """Load device configuration"""
@@ -67,68 +97,204 @@ class GoveeSensor:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
-                    self.mac_address = config.get('mac_address')
+                    self._set_mac(config.get('mac_address'))
                     return self.mac_address
         except Exception as e:
-            self.logger.error(f"Error loading configuration: {str(e)}")
+            self.logger.error("Error loading configuration: %s", e)
         return None
 
-    def decode_sensor_data(self, manufacturer_data: Dict) -> Optional[Dict]:
-        """Decode Govee H5074 manufacturer specific data"""
+    def _now_str(self) -> str:
+        """Format the current time once per second and reuse the string"""
+        s = int(time.time())
+        if s != self._ts_sec:
+            self._ts_sec = s
+            self._ts_str = datetime.fromtimestamp(s).strftime("%Y-%m-%d %H:%M:%S")
+        return self._ts_str
+
+    def decode_sensor_data(self, manufacturer_data: Dict, out: Optional[Dict] = None) -> Optional[Dict]:
+        """Decode Govee H5074 manufacturer specific data, reusing `out` if given"""
         try:
             if 60552 not in manufacturer_data:
                 return None
-                
+
             data = manufacturer_data[60552]
-            self.logger.debug(f"Raw manufacturer data: {data.hex()}")
-            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Raw manufacturer data: %s", data.hex())
+
             if len(data) < 6:
                 return None
-                
-            temp = int.from_bytes(data[1:3], byteorder='little') / 100.0
-            humidity = int.from_bytes(data[3:5], byteorder='little') / 100.0
-            battery = data[5]
-            
-            return {
-                'temperature': temp,
-                'humidity': humidity,
-                'battery': battery,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'raw_hex': data.hex()
-            }
+
+            temp, humidity, battery = _H5074_FMT.unpack_from(data, 1)
+
+            # Keys are inserted in CSV field order so rows can be
+            # serialized straight from values()
+            decoded = out if out is not None else {}
+            decoded.clear()
+            decoded['timestamp'] = self._now_str()
+            decoded['temperature'] = temp / 100.0
+            decoded['humidity'] = humidity / 100.0
+            decoded['battery'] = battery
+            if self.include_raw_hex:
+                decoded['raw_hex'] = data.hex()
+            return decoded
         except Exception as e:
-            self.logger.error(f"Error decoding sensor data: {str(e)}")
+            self.logger.error("Error decoding sensor data: %s", e)
             return None
 
+    def _ensure_writer(self, fieldnames):
+        """Open the CSV once and freeze the field order for fast row formatting"""
+        if self._csv_fh is None:
+            # A non-empty existing file already carries its header
+            self._header_written = (os.path.exists(self.data_file)
+                                    and os.path.getsize(self.data_file) > 0)
+            self._csv_fh = open(self.data_file, 'a', newline='', buffering=8192)
+            self._csv_fields = tuple(fieldnames)
+            if not self._header_written:
+                self._csv_fh.write(",".join(self._csv_fields) + "\n")
+                self._header_written = True
+
+    def _acquire_row(self) -> Dict:
+        """Take a reusable row dict from the pool, or allocate a new one"""
+        try:
+            return self._row_pool.pop()
+        except IndexError:
+            return {}
+
+    def _release_row(self, row: Dict):
+        """Return a row dict to the pool for reuse"""
+        if len(self._row_pool) < 8:
+            row.clear()
+            self._row_pool.append(row)
+
+    def _write_rows(self, rows):
+        """Write a batch of rows to the CSV and return them to the pool"""
+        try:
+            fields = self._csv_fields
+            nfields = len(fields)
+            lines = []
+            for row in rows:
+                if len(row) == nfields:
+                    # Rows are built in field order, so values() skips
+                    # re-hashing every field name
+                    lines.append(",".join(map(str, row.values())) + "\n")
+                else:
+                    lines.append(",".join(str(row.get(k, '')) for k in fields) + "\n")
+            self._csv_fh.write("".join(lines))
+            self._csv_fh.flush()
+            for row in rows:
+                self._release_row(row)
+        except Exception as e:
+            self.logger.error("Error writing data rows: %s", e)
+
+    def _enqueue_row(self, row: Dict):
+        """Hand a row to the writer task, dropping the oldest on overflow"""
+        try:
+            self._log_queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                self._release_row(self._log_queue.get_nowait())
+                self.logger.warning("Log queue full; dropping oldest row")
+            except asyncio.QueueEmpty:
+                pass
+            self._log_queue.put_nowait(row)
+
+    def _drain_queue(self):
+        """Write out anything still sitting in the log queue"""
+        if self._log_queue is None:
+            return
+        rows = []
+        while True:
+            try:
+                rows.append(self._log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        if rows:
+            self._write_rows(rows)
+
+    async def _writer_task(self):
+        """Drain queued rows and write them to the CSV in batches"""
+        while True:
+            rows = [await self._log_queue.get()]
+            while True:
+                try:
+                    rows.append(self._log_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self._write_rows(rows)
+
+    def _close_writer(self):
+        """Close the cached CSV handle if one is open"""
+        if self._csv_fh is not None:
+            self._drain_queue()
+            try:
+                self._csv_fh.close()
+            except Exception as e:
+                self.logger.error("Error closing data file: %s", e)
+            self._csv_fh = None
+            self._csv_fields = None
+
     def log_data(self, data: Dict):
         """Log sensor data to CSV with error handling"""
         try:
-            file_exists = os.path.exists(self.data_file)
-            with open(self.data_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['timestamp', 'temperature', 'humidity', 'battery', 'raw_hex'])
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(data)
-            self.logger.info(f"Data logged: Temp={data['temperature']}°C, Humidity={data['humidity']}%")
+            fieldnames = ['timestamp', 'temperature', 'humidity', 'battery']
+            if self.include_raw_hex:
+                fieldnames.append('raw_hex')
+            self._ensure_writer(fieldnames)
+            if self._log_queue is not None:
+                # Callbacks may fire off-loop on some backends; marshal onto it
+                self._loop.call_soon_threadsafe(self._enqueue_row, data)
+            else:
+                self._write_rows([data])
+            self.logger.info("Data logged: Temp=%s, Humidity=%s", data['temperature'], data['humidity'])
         except Exception as e:
-            self.logger.error(f"Error logging data: {str(e)}")
+            self.logger.error("Error logging data: %s", e)
+
+    async def _start_scanner(self, detection_callback):
+        """Start a scanner, preferring backend-filtered passive scanning and
+        falling back to a plain active scan on hosts without support"""
+        if BlueZScannerArgs is not None:
+            try:
+                # Passive mode suffices: the H5074 telemetry rides in the
+                # advertisement itself, so no SCAN_REQ round-trip is needed,
+                # and BlueZ only honours or-patterns when scanning passively
+                scanner = BleakScanner(
+                    detection_callback=detection_callback,
+                    scanning_mode="passive",
+                    bluez=BlueZScannerArgs(or_patterns=[
+                        OrPattern(0, AdvertisementDataType.MANUFACTURER_SPECIFIC_DATA,
+                                  _GOVEE_MFR_PREFIX)
+                    ]))
+                # AdvertisementMonitor registration needs a recent BlueZ and
+                # kernel; unsupported hosts only fail once the scan starts
+                await scanner.start()
+                return scanner
+            except (BleakError, OSError, TypeError) as e:
+                self.logger.info("Passive filtered scan unavailable (%s); using active scan", e)
+        scanner = BleakScanner(detection_callback=detection_callback)
+        await scanner.start()
+        return scanner
 
     async def monitor_continuous(self, interval: int = 60):
         """Continuously monitor sensor data through advertisements"""
-        self._last_log_time = time.time()  # Initialize last log time
-        
+        next_log_time = time.monotonic() + interval  # first reading after one interval
+
         def should_log() -> bool:
-            current_time = time.time()
-            if current_time - self._last_log_time >= interval:
-                self._last_log_time = current_time
+            nonlocal next_log_time
+            now = time.monotonic()
+            if now >= next_log_time:
+                next_log_time = now + interval
                 return True
             return False
 
         def detection_callback(device, advertisement_data):
-            if device.address.upper() == self.mac_address.upper():
+            addr = device.address
+            if addr in self._mac_set or addr.upper() in self._mac_set:
                 if advertisement_data.manufacturer_data and should_log():
-                    data = self.decode_sensor_data(advertisement_data.manufacturer_data)
-                    if data:
+                    row = self._acquire_row()
+                    data = self.decode_sensor_data(advertisement_data.manufacturer_data, row)
+                    if data is None:
+                        self._release_row(row)
+                    else:
                         self.log_data(data)
                         print(f"\nTemperature: {data['temperature']}°C")
                         print(f"Humidity: {data['humidity']}%")
@@ -138,14 +304,38 @@ class GoveeSensor:
 
         print(f"\nStarting monitoring with {interval} second intervals")
         print("Press Ctrl+C to stop\n")
-        
-        async with BleakScanner(detection_callback=detection_callback):
-            self.logger.info(f"Started monitoring device: {self.mac_address}")
+
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._log_queue = asyncio.Queue(maxsize=256)
+        try:
+            loop.add_signal_handler(signal.SIGINT, self._stop_event.set)
+        except NotImplementedError:
+            pass  # platform without signal handlers; fall back to KeyboardInterrupt
+
+        writer_task = None
+        scanner = None
+        try:
+            scanner = await self._start_scanner(detection_callback)
+            self.logger.info("Started monitoring device: %s", self.mac_address)
+            writer_task = asyncio.create_task(self._writer_task())
             try:
-                while True:
-                    await asyncio.sleep(1)
+                await self._stop_event.wait()
             except KeyboardInterrupt:
-                print("\nMonitoring stopped by user")
+                pass
+            print("\nMonitoring stopped by user")
+        finally:
+            if scanner is not None:
+                await scanner.stop()
+            if writer_task is not None:
+                writer_task.cancel()
+            self._close_writer()
+            self._log_queue = None
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, ValueError):
+                pass
 
 async def main():
     import argparse
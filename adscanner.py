@@ -7,8 +7,16 @@ from datetime import datetime
 import csv
 import logging
 from logging.handlers import RotatingFileHandler
+import time
+
+# Govee H5074 payload layout after the status byte: temperature and
+# humidity as little-endian uint16 (centi-units), then battery percent
+_H5074_FMT = struct.Struct('<HHB')
 
 class GoveeSensor:
+    _ts_sec = 0
+    _ts_str = ''
+
     def __init__(self, mac_address):
         self.mac_address = mac_address.upper()
         self.data_file = f'govee_data_{datetime.now().strftime("%Y%m%d")}.csv'
@@ -22,6 +30,14 @@ class GoveeSensor:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
+    def _now_str(self):
+        """Format the current time once per second and reuse the string"""
+        s = int(time.time())
+        if s != self._ts_sec:
+            self._ts_sec = s
+            self._ts_str = datetime.fromtimestamp(s).strftime("%Y-%m-%d %H:%M:%S")
+        return self._ts_str
+
     def decode_sensor_data(self, manufacturer_data):
         """Decode Govee H5074 manufacturer specific data"""
         try:
@@ -30,7 +46,8 @@ class GoveeSensor:
                 return None
                 
             data = manufacturer_data[60552]
-            self.logger.debug(f"Raw manufacturer data: {data.hex()}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Raw manufacturer data: %s", data.hex())
             
             # Data format: b'\x00F\x0c\x88\x0eE\x02'
             # Looking at your data:
@@ -42,23 +59,21 @@ class GoveeSensor:
                 return None
                 
             # Extract values (adjusting positions based on observed data)
-            temp = int.from_bytes(data[1:3], byteorder='little') / 100.0
-            humidity = int.from_bytes(data[3:5], byteorder='little') / 100.0
-            battery = data[5]  # Single byte for battery percentage
-            
+            temp, humidity, battery = _H5074_FMT.unpack_from(data, 1)
+
             decoded_data = {
-                'temperature': temp,
-                'humidity': humidity,
+                'temperature': temp / 100.0,
+                'humidity': humidity / 100.0,
                 'battery': battery,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'timestamp': self._now_str(),
                 'raw_hex': data.hex()  # Include raw data for debugging
             }
             
-            self.logger.debug(f"Decoded data: {decoded_data}")
+            self.logger.debug("Decoded data: %s", decoded_data)
             return decoded_data
             
         except Exception as e:
-            self.logger.error(f"Error decoding sensor data: {str(e)}")
+            self.logger.error("Error decoding sensor data: %s", e)
             return None
 
     def log_data(self, data):
@@ -69,16 +84,18 @@ class GoveeSensor:
                 if f.tell() == 0:  # File is empty
                     writer.writeheader()
                 writer.writerow(data)
-            self.logger.info(f"Data logged: Temp={data['temperature']}°C, Humidity={data['humidity']}%, Battery={data['battery']}%")
+            self.logger.info("Data logged: Temp=%s, Humidity=%s, Battery=%s", data['temperature'], data['humidity'], data['battery'])
         except Exception as e:
-            self.logger.error(f"Error logging data: {str(e)}")
+            self.logger.error("Error logging data: %s", e)
 
     async def scan_advertisements(self):
         """Scan for advertisements from the configured device"""
         def detection_callback(device, advertisement_data):
-            if device.address.upper() == self.mac_address:
+            addr = device.address
+            if addr == self.mac_address or addr.upper() == self.mac_address:
                 if advertisement_data.manufacturer_data:
-                    self.logger.debug(f"Raw advertisement data: {advertisement_data}")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("Raw advertisement data: %s", advertisement_data)
                     data = self.decode_sensor_data(advertisement_data.manufacturer_data)
                     if data:
                         self.log_data(data)
@@ -1,33 +1,97 @@
 #!/usr/bin/env python3
 
 import asyncio
-import csv
+import copy
+import struct
 from datetime import datetime
 from bleak import BleakScanner
+from bleak.exc import BleakError
+try:
+    from bleak.assigned_numbers import AdvertisementDataType
+    from bleak.backends.bluezdbus.advertisement_monitor import OrPattern
+    from bleak.backends.bluezdbus.scanner import BlueZScannerArgs
+except ImportError:  # older bleak or non-BlueZ backend
+    AdvertisementDataType = OrPattern = BlueZScannerArgs = None
 import json
 import os
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used when unavailable
+    orjson = None
 from typing import Dict, List, Optional
 import logging
 from logging.handlers import RotatingFileHandler
+import signal
 import time
 import re
 
+# Govee H5074 payload layout after the status byte: temperature and
+# humidity as little-endian uint16 (centi-units), then battery percent
+_H5074_FMT = struct.Struct('<HHB')
+
+# Manufacturer ID 60552 (0xEC88) little-endian, as it appears at the
+# start of the manufacturer-specific AD structure
+_GOVEE_MFR_PREFIX = b"\x88\xec"
+
+# Parsed config cache: path -> ((st_mtime_ns, st_size), parsed dict)
+_CONFIG_CACHE = {}
+
 class DeviceConfig:
     def __init__(self, config_file='device_config.json'):
         self.config_file = config_file
         self.config = self.load_config()
+        # Indexed under both the configured spelling and upper case so
+        # lookups can usually skip the .upper() allocation
+        self._mac_index = {}
+        for d in self.config['devices']:
+            self._mac_index[d['mac_address']] = d
+            self._mac_index[d['mac_address'].upper()] = d
 
     def load_config(self) -> dict:
-        """Load device configuration"""
+        """Load device configuration, reusing the parsed result if unchanged"""
         if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return {"devices": []}
+            st = os.stat(self.config_file)
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = _CONFIG_CACHE.get(self.config_file)
+            if cached is not None and cached[0] == stamp:
+                config = copy.deepcopy(cached[1])
+            else:
+                if orjson is not None:
+                    with open(self.config_file, 'rb') as f:
+                        config = orjson.loads(f.read())
+                else:
+                    with open(self.config_file, 'r') as f:
+                        config = json.load(f)
+                _CONFIG_CACHE[self.config_file] = (stamp, copy.deepcopy(config))
+        else:
+            config = {"devices": []}
+        for device in config['devices']:
+            self._compile_filter(device)
+        return config
+
+    @staticmethod
+    def _compile_filter(device: dict):
+        """Pre-compile the device's name pattern for fast matching"""
+        pattern = device.get('scan_filter', {}).get('name_pattern')
+        if pattern:
+            device['_compiled_name_pattern'] = re.compile(pattern)
 
     def save_config(self):
-        """Save current configuration"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=4)
+        """Save current configuration, skipping runtime-only keys"""
+        serializable = {
+            **self.config,
+            'devices': [
+                {k: v for k, v in device.items() if not k.startswith('_')}
+                for device in self.config['devices']
+            ]
+        }
+        if orjson is not None:
+            with open(self.config_file, 'wb') as f:
+                f.write(orjson.dumps(serializable, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.config_file, 'w') as f:
+                json.dump(serializable, f, indent=4)
 
     def get_device_by_key(self, key: str) -> Optional[dict]:
         """Get device configuration by key"""
@@ -38,11 +102,10 @@ class DeviceConfig:
 
     def get_device_by_mac(self, mac_address: str) -> Optional[dict]:
         """Get device configuration by MAC address"""
-        mac_address = mac_address.upper()
-        for device in self.config['devices']:
-            if device['mac_address'].upper() == mac_address:
-                return device
-        return None
+        device = self._mac_index.get(mac_address)
+        if device is None:
+            device = self._mac_index.get(mac_address.upper())
+        return device
 
     def add_device(self, key: str, description: str, mac_address: str, 
                   device_type: str, scan_filter: dict) -> dict:
@@ -59,7 +122,10 @@ class DeviceConfig:
             "decoder": {},
             "fields": {}
         }
+        self._compile_filter(device)
         self.config['devices'].append(device)
+        self._mac_index[mac_address] = device
+        self._mac_index[mac_address.upper()] = device
         self.save_config()
         return device
 
@@ -76,12 +142,23 @@ class DeviceConfig:
             self.save_config()
 
 class BLELogger:
+    _ts_sec = 0
+    _ts_str = ''
+
     def __init__(self):
         self.config = DeviceConfig()
         self.data_file = f'ble_data_{datetime.now().strftime("%Y%m%d")}.csv'
         self.setup_logging()
-        self._last_log_time = 0
-        
+        self._csv_fh = None
+        self._csv_fields = None
+        self._header_written = False
+        self._log_queue = None
+        self._loop = None
+        self._row_pool = [dict() for _ in range(8)]
+        self._decode_buf = {}
+        self._name_match_cache = {}
+        self.include_raw_hex = False
+
     def setup_logging(self):
         """Setup rotating log handler"""
         self.logger = logging.getLogger('BLELogger')
@@ -91,33 +168,34 @@ class BLELogger:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
-    def matches_filter(self, device_name: str, scan_filter: dict) -> bool:
-        """Check if device matches scan filter"""
-        if 'name_pattern' in scan_filter:
-            pattern = scan_filter['name_pattern']
-            return bool(re.match(pattern, device_name)) if device_name else False
-        return False
+    def matches_filter(self, device_name: str, device_config: dict) -> bool:
+        """Check if device name matches the device's compiled scan filter"""
+        pattern = device_config.get('_compiled_name_pattern')
+        if pattern is None:
+            return False
+        return bool(pattern.match(device_name)) if device_name else False
 
     async def scan_devices(self, name_pattern: Optional[str] = None) -> list:
         """Scan for BLE devices with optional name pattern filter"""
         try:
-            self.logger.info(f"Starting BLE scan with filter: {name_pattern}")
+            self.logger.info("Starting BLE scan with filter: %s", name_pattern)
             devices = await BleakScanner.discover(timeout=10)
             matching_devices = []
-            
+            pattern = re.compile(name_pattern) if name_pattern else None
+
             for device in devices:
-                if device.name and (name_pattern is None or 
-                                  re.match(name_pattern, device.name)):
+                if device.name and (pattern is None or
+                                  pattern.match(device.name)):
                     matching_devices.append({
                         'mac': device.address,
                         'name': device.name,
                         'rssi': device.rssi
                     })
-                    self.logger.info(f"Found device: {device.name} ({device.address})")
+                    self.logger.info("Found device: %s (%s)", device.name, device.address)
             
             return matching_devices
         except Exception as e:
-            self.logger.error(f"Scan error: {str(e)}")
+            self.logger.error("Scan error: %s", e)
             return []
 
     async def configure_device(self, name_pattern: Optional[str] = None):
@@ -189,43 +267,58 @@ class BLELogger:
 
         print("\nDevice configuration complete!")
 
-    def decode_data(self, device_config: dict, advertisement_data: Dict) -> Optional[Dict]:
+    def decode_data(self, device_config: dict, advertisement_data: Dict,
+                    out: Optional[Dict] = None) -> Optional[Dict]:
         """Decode device data based on configuration"""
         decoder_type = device_config.get('decoder', {}).get('type')
-        
+
         if decoder_type == 'govee_h5074':
-            return self._decode_govee_h5074(advertisement_data)
+            return self._decode_govee_h5074(advertisement_data, out)
         # Add more decoders as needed
-        
+
         return None
 
-    def _decode_govee_h5074(self, advertisement_data: Dict) -> Optional[Dict]:
-        """Decode Govee H5074 data"""
+    def _decode_govee_h5074(self, advertisement_data: Dict,
+                            out: Optional[Dict] = None) -> Optional[Dict]:
+        """Decode Govee H5074 data, reusing `out` if given"""
         try:
             if 60552 not in advertisement_data.manufacturer_data:
                 return None
-                
+
             data = advertisement_data.manufacturer_data[60552]
             if len(data) < 6:
                 return None
-                
-            return {
-                'temperature': int.from_bytes(data[1:3], byteorder='little') / 100.0,
-                'humidity': int.from_bytes(data[3:5], byteorder='little') / 100.0,
-                'battery': data[5],
-                'raw_hex': data.hex()
-            }
+
+            temp, humidity, battery = _H5074_FMT.unpack_from(data, 1)
+
+            decoded = out if out is not None else {}
+            decoded.clear()
+            decoded['temperature'] = temp / 100.0
+            decoded['humidity'] = humidity / 100.0
+            decoded['battery'] = battery
+            if self.include_raw_hex:
+                decoded['raw_hex'] = data.hex()
+            return decoded
         except Exception as e:
-            self.logger.error(f"Error decoding Govee data: {str(e)}")
+            self.logger.error("Error decoding Govee data: %s", e)
             return None
 
-    def map_data_to_config(self, device_config: dict, raw_data: Dict) -> Dict:
-        """Map raw data to configured fields"""
-        mapped_data = {
-            'key': device_config['key'],
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
+    def _now_str(self) -> str:
+        """Format the current time once per second and reuse the string"""
+        s = int(time.time())
+        if s != self._ts_sec:
+            self._ts_sec = s
+            self._ts_str = datetime.fromtimestamp(s).strftime("%Y-%m-%d %H:%M:%S")
+        return self._ts_str
+
+    def map_data_to_config(self, device_config: dict, raw_data: Dict,
+                           out: Optional[Dict] = None) -> Dict:
+        """Map raw data to configured fields, reusing `out` if given"""
+        mapped_data = out if out is not None else {}
+        mapped_data.clear()
+        mapped_data['key'] = device_config['key']
+        mapped_data['timestamp'] = self._now_str()
+
         for field_name, field_config in device_config['fields'].items():
             if field_config['enabled']:
                 source = field_config['source_field']
@@ -234,27 +327,145 @@ class BLELogger:
 
         return mapped_data
 
+    def _ensure_writer(self, fieldnames):
+        """Open the CSV once and freeze the field order for fast row formatting"""
+        if self._csv_fh is None:
+            # A non-empty existing file already carries its header
+            self._header_written = (os.path.exists(self.data_file)
+                                    and os.path.getsize(self.data_file) > 0)
+            self._csv_fh = open(self.data_file, 'a', newline='', buffering=8192)
+            self._csv_fields = tuple(fieldnames)
+            if not self._header_written:
+                self._csv_fh.write(",".join(self._csv_fields) + "\n")
+                self._header_written = True
+
+    def _acquire_row(self) -> Dict:
+        """Take a reusable row dict from the pool, or allocate a new one"""
+        try:
+            return self._row_pool.pop()
+        except IndexError:
+            return {}
+
+    def _release_row(self, row: Dict):
+        """Return a row dict to the pool for reuse"""
+        if len(self._row_pool) < 8:
+            row.clear()
+            self._row_pool.append(row)
+
+    def _write_rows(self, rows):
+        """Write a batch of rows to the CSV and return them to the pool"""
+        try:
+            fields = self._csv_fields
+            nfields = len(fields)
+            lines = []
+            for row in rows:
+                if len(row) == nfields:
+                    # Rows are built in field order, so values() skips
+                    # re-hashing every field name
+                    lines.append(",".join(map(str, row.values())) + "\n")
+                else:
+                    lines.append(",".join(str(row.get(k, '')) for k in fields) + "\n")
+            self._csv_fh.write("".join(lines))
+            self._csv_fh.flush()
+            for row in rows:
+                self._release_row(row)
+        except Exception as e:
+            self.logger.error("Error writing data rows: %s", e)
+
+    def _enqueue_row(self, row: Dict):
+        """Hand a row to the writer task, dropping the oldest on overflow"""
+        try:
+            self._log_queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                self._release_row(self._log_queue.get_nowait())
+                self.logger.warning("Log queue full; dropping oldest row")
+            except asyncio.QueueEmpty:
+                pass
+            self._log_queue.put_nowait(row)
+
+    def _drain_queue(self):
+        """Write out anything still sitting in the log queue"""
+        if self._log_queue is None:
+            return
+        rows = []
+        while True:
+            try:
+                rows.append(self._log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        if rows:
+            self._write_rows(rows)
+
+    async def _writer_task(self):
+        """Drain queued rows and write them to the CSV in batches"""
+        while True:
+            rows = [await self._log_queue.get()]
+            while True:
+                try:
+                    rows.append(self._log_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self._write_rows(rows)
+
+    def _close_writer(self):
+        """Close the cached CSV handle if one is open"""
+        if self._csv_fh is not None:
+            self._drain_queue()
+            try:
+                self._csv_fh.close()
+            except Exception as e:
+                self.logger.error("Error closing data file: %s", e)
+            self._csv_fh = None
+            self._csv_fields = None
+
     def log_data(self, data: Dict):
         """Log mapped sensor data to CSV"""
         try:
-            file_exists = os.path.exists(self.data_file)
-            with open(self.data_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=list(data.keys()))
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(data)
-            self.logger.info(f"Data logged for device {data['key']}")
+            self._ensure_writer(list(data.keys()))
+            if self._log_queue is not None:
+                # Callbacks may fire off-loop on some backends; marshal onto it
+                self._loop.call_soon_threadsafe(self._enqueue_row, data)
+            else:
+                self._write_rows([data])
+            self.logger.info("Data logged for device %s", data['key'])
         except Exception as e:
-            self.logger.error(f"Error logging data: {str(e)}")
+            self.logger.error("Error logging data: %s", e)
+
+    async def _start_scanner(self, detection_callback):
+        """Start a scanner, preferring backend-filtered passive scanning and
+        falling back to a plain active scan on hosts without support"""
+        if BlueZScannerArgs is not None:
+            try:
+                # Passive mode suffices: the H5074 telemetry rides in the
+                # advertisement itself, so no SCAN_REQ round-trip is needed,
+                # and BlueZ only honours or-patterns when scanning passively
+                scanner = BleakScanner(
+                    detection_callback=detection_callback,
+                    scanning_mode="passive",
+                    bluez=BlueZScannerArgs(or_patterns=[
+                        OrPattern(0, AdvertisementDataType.MANUFACTURER_SPECIFIC_DATA,
+                                  _GOVEE_MFR_PREFIX)
+                    ]))
+                # AdvertisementMonitor registration needs a recent BlueZ and
+                # kernel; unsupported hosts only fail once the scan starts
+                await scanner.start()
+                return scanner
+            except (BleakError, OSError, TypeError) as e:
+                self.logger.info("Passive filtered scan unavailable (%s); using active scan", e)
+        scanner = BleakScanner(detection_callback=detection_callback)
+        await scanner.start()
+        return scanner
 
     async def monitor_devices(self, interval: int = 60):
         """Monitor all configured devices"""
-        self._last_log_time = 0  # Initialize to 0 to ensure first reading is captured
-        
+        next_log_time = time.monotonic()  # immediate deadline so the first reading is captured
+
         def should_log() -> bool:
-            current_time = time.time()
-            if self._last_log_time == 0 or (current_time - self._last_log_time) >= interval:
-                self._last_log_time = current_time
+            nonlocal next_log_time
+            now = time.monotonic()
+            if now >= next_log_time:
+                next_log_time = now + interval
                 return True
             return False
 
@@ -264,13 +475,28 @@ class BLELogger:
             if not device_config:
                 return
 
+            # Verify the advertised name against the scan filter, memoized
+            # per address since a device's name rarely changes
+            name = device.name
+            if name:
+                cached = self._name_match_cache.get(device.address)
+                if cached is None or cached[0] != name:
+                    matched = self.matches_filter(name, device_config)
+                    self._name_match_cache[device.address] = (name, matched)
+                else:
+                    matched = cached[1]
+                if not matched:
+                    return
+
             if not should_log():
                 return
 
             if advertisement_data.manufacturer_data:
-                raw_data = self.decode_data(device_config, advertisement_data)
+                raw_data = self.decode_data(device_config, advertisement_data,
+                                            self._decode_buf)
                 if raw_data:
-                    mapped_data = self.map_data_to_config(device_config, raw_data)
+                    mapped_data = self.map_data_to_config(device_config, raw_data,
+                                                          self._acquire_row())
                     if mapped_data:
                         self.log_data(mapped_data)
                         # Clean, minimal output showing only the sensor readings
@@ -281,68 +507,37 @@ class BLELogger:
 
         print(f"\nStarting BLE device monitoring (logging interval: {interval}s)")
         print("Press Ctrl+C to stop\n")
-        
-        async with BleakScanner(detection_callback=detection_callback):
-            try:
-                while True:
-                    await asyncio.sleep(1)
-            except KeyboardInterrupt:
-                print("\nMonitoring stopped by user")
-
-        def detection_callback(device, advertisement_data):
-            # Only process devices in our config
-            device_config = self.config.get_device_by_mac(device.address)
-            if not device_config:
-                return
-
-            if not should_log():
-                return
 
-            if advertisement_data.manufacturer_data:
-                raw_data = self.decode_data(device_config, advertisement_data)
-                if raw_data:
-                    mapped_data = self.map_data_to_config(device_config, raw_data)
-                    if mapped_data:
-                        self.log_data(mapped_data)
-                        # Clean, minimal output showing only the sensor readings
-                        print(f"\n{mapped_data['timestamp']} - {device_config['key']}")
-                        for key, value in mapped_data.items():
-                            if key not in ['timestamp', 'key']:
-                                print(f"{key}: {value}")
-
-            # Find matching device in config
-            device_config = self.config.get_device_by_mac(device.address)
-            if not device_config:
-                print(f"Device {device.address} not found in config")
-                return
-
-            # Verify device name matches filter
-            if not self.matches_filter(device.name, device_config['scan_filter']):
-                return
-
-            if advertisement_data.manufacturer_data:
-                raw_data = self.decode_data(device_config, advertisement_data)
-                if raw_data:
-                    mapped_data = self.map_data_to_config(device_config, raw_data)
-                    if mapped_data:
-                        self.log_data(mapped_data)
-                        print(f"\nDevice: {device_config['key']} ({device_config['description']})")
-                        for key, value in mapped_data.items():
-                            if key not in ['timestamp', 'key']:
-                                print(f"{key}: {value}")
-                        print(f"Next update in {interval} seconds")
-                        print("-" * 40)
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._log_queue = asyncio.Queue(maxsize=256)
+        try:
+            loop.add_signal_handler(signal.SIGINT, self._stop_event.set)
+        except NotImplementedError:
+            pass  # platform without signal handlers; fall back to KeyboardInterrupt
 
-        print(f"\nStarting monitoring with {interval} second intervals")
-        print("Press Ctrl+C to stop\n")
-        
-        async with BleakScanner(detection_callback=detection_callback):
-            self.logger.info("Started monitoring configured devices")
+        writer_task = None
+        scanner = None
+        try:
+            scanner = await self._start_scanner(detection_callback)
+            writer_task = asyncio.create_task(self._writer_task())
             try:
-                while True:
-                    await asyncio.sleep(1)
+                await self._stop_event.wait()
             except KeyboardInterrupt:
-                print("\nMonitoring stopped by user")
+                pass
+            print("\nMonitoring stopped by user")
+        finally:
+            if scanner is not None:
+                await scanner.stop()
+            if writer_task is not None:
+                writer_task.cancel()
+            self._close_writer()
+            self._log_queue = None
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, ValueError):
+                pass
 
 async def main():
     import argparse